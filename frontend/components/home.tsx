@@ -479,20 +479,18 @@ export default function Home() {
               fileContentMap[file.name] = content;
 
               // Upload the file
+              const params = new URLSearchParams({
+                session_id: connectionId ?? "",
+                path: file.name,
+              });
               const response = await fetch(
-                `${process.env.NEXT_PUBLIC_API_URL}/api/upload`,
+                `${process.env.NEXT_PUBLIC_API_URL}/api/upload/binary?${params}`,
                 {
                   method: "POST",
                   headers: {
-                    "Content-Type": "application/json",
+                    "Content-Type": "application/octet-stream",
                   },
-                  body: JSON.stringify({
-                    session_id: connectionId,
-                    file: {
-                      path: file.name,
-                      content,
-                    },
-                  }),
+                  body: file,
                 }
               );
 
@@ -860,8 +858,12 @@ export default function Home() {
 
       ws.onmessage = (event) => {
         try {
+          // The server coalesces bursts of events into a single array frame
           const data = JSON.parse(event.data);
-          handleEvent({ ...data, id: Date.now().toString() });
+          const events = Array.isArray(data) ? data : [data];
+          events.forEach((item, index) => {
+            handleEvent({ ...item, id: `${Date.now()}-${index}` });
+          });
         } catch (error) {
           console.error("Error parsing WebSocket data:", error);
         }
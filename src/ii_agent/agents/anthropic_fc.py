@@ -6,7 +6,7 @@ import uuid
 from typing import List
 from fastapi import WebSocket
 from ii_agent.agents.base import BaseAgent
-from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.core.event import EventType, RealtimeEvent, encode_event
 from ii_agent.llm.base import LLMClient, TextResult, ToolCallParameters
 from ii_agent.llm.context_manager.base import ContextManager
 from ii_agent.llm.message_history import MessageHistory
@@ -25,6 +25,7 @@ TOOL_CALL_INTERRUPT_FAKE_MODEL_RSP = (
 AGENT_INTERRUPT_FAKE_MODEL_RSP = (
     "Agent interrupted by user. You can resume by providing a new instruction."
 )
+MAX_EVENTS_PER_FRAME = 32
 
 
 class AnthropicFC(BaseAgent):
@@ -104,43 +105,90 @@ try breaking down the task into smaller steps. After call this tool to update or
         try:
             while True:
                 try:
-                    message: RealtimeEvent = await self.message_queue.get()
-
-                    # Save all events to database if we have a session
-                    if self.session_id is not None:
-                        self.db_manager.save_event(self.session_id, message)
-                    else:
-                        self.logger_for_agent_logs.info(
-                            f"No session ID, skipping event: {message}"
-                        )
-
-                    # Only send to websocket if this is not an event from the client and websocket exists
-                    if (
-                        message.type != EventType.USER_MESSAGE
-                        and self.websocket is not None
-                    ):
+                    # Wait for one event, then take whatever else is already
+                    # queued so a burst goes out as a single websocket frame.
+                    batch: List[RealtimeEvent] = [await self.message_queue.get()]
+                    while len(batch) < MAX_EVENTS_PER_FRAME:
                         try:
-                            await self.websocket.send_json(message.model_dump())
-                        except Exception as e:
-                            # If websocket send fails, just log it and continue processing
-                            self.logger_for_agent_logs.warning(
-                                f"Failed to send message to websocket: {str(e)}"
-                            )
-                            # Set websocket to None to prevent further attempts
-                            self.websocket = None
-
-                    self.message_queue.task_done()
+                            batch.append(self.message_queue.get_nowait())
+                        except asyncio.QueueEmpty:
+                            break
+
+                    try:
+                        self._save_batch(batch)
+                        await self._send_batch(batch)
+                    finally:
+                        for _ in batch:
+                            self.message_queue.task_done()
                 except asyncio.CancelledError:
                     break
                 except Exception as e:
                     self.logger_for_agent_logs.error(
-                        f"Error processing WebSocket message: {str(e)}"
+                        "Error processing WebSocket message: %s", e
                     )
         except asyncio.CancelledError:
             self.logger_for_agent_logs.info("Message processor stopped")
         except Exception as e:
             self.logger_for_agent_logs.error(f"Error in message processor: {str(e)}")
 
+    def _save_batch(self, batch: List[RealtimeEvent]) -> None:
+        """Save a batch of events, one by one if the batch insert fails."""
+        if self.session_id is None:
+            for message in batch:
+                self.logger_for_agent_logs.info(
+                    "No session ID, skipping event: %s", message
+                )
+            return
+
+        try:
+            self.db_manager.save_events(self.session_id, batch)
+            return
+        except Exception as e:
+            self.logger_for_agent_logs.error("Failed to save event batch: %s", e)
+
+        # Retry each event on its own so one bad event does not lose the rest
+        for message in batch:
+            try:
+                self.db_manager.save_event(self.session_id, message)
+            except Exception as e:
+                self.logger_for_agent_logs.error(
+                    "Failed to save event %s: %s", message.type, e
+                )
+
+    async def _send_batch(self, batch: List[RealtimeEvent]) -> None:
+        """Send a batch of events to the websocket in one frame."""
+        if self.websocket is None:
+            return
+
+        outgoing = []
+        for message in batch:
+            # Only send to websocket if this is not an event from the client
+            if message.type == EventType.USER_MESSAGE:
+                continue
+            try:
+                outgoing.append(encode_event(message.type, message.content))
+            except Exception as e:
+                self.logger_for_agent_logs.error(
+                    "Failed to encode event %s: %s", message.type, e
+                )
+        if not outgoing:
+            return
+
+        try:
+            # A lone event is sent as-is, a burst as a JSON array
+            if len(outgoing) == 1:
+                payload = outgoing[0]
+            else:
+                payload = "[" + ",".join(outgoing) + "]"
+            await self.websocket.send_text(payload)
+        except Exception as e:
+            # If websocket send fails, just log it and continue processing
+            self.logger_for_agent_logs.warning(
+                "Failed to send message to websocket: %s", e
+            )
+            # Set websocket to None to prevent further attempts
+            self.websocket = None
+
     def _validate_tool_parameters(self):
         """Validate tool parameters and check for duplicates."""
         tool_params = [tool.get_tool_param() for tool in self.tool_manager.get_tools()]
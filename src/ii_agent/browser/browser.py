@@ -19,6 +19,7 @@ from playwright.async_api import (
     StorageState,
     async_playwright,
 )
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from tenacity import (
     retry,
     retry_if_exception_type,
@@ -40,7 +41,7 @@ from ii_agent.browser.utils import (
     put_highlight_elements_on_screenshot,
     scale_b64_image,
 )
-from ii_agent.browser.utils import is_pdf_url
+from ii_agent.browser.utils import is_pdf_url_async
 
 logger = logging.getLogger(__name__)
 
@@ -319,7 +320,18 @@ class Browser:
         """Navigate to a URL"""
         page = await self.get_current_page()
         await page.goto(url, wait_until="domcontentloaded")
-        await asyncio.sleep(2)
+        await self.wait_for_page_settle(page, timeout=2)
+
+    async def wait_for_page_settle(self, page: Page, timeout: float):
+        """Wait for the page's network to go idle, for at most timeout seconds.
+
+        Used after navigation instead of a fixed sleep: pages that finish
+        loading early are ready sooner, busy ones wait no longer than before.
+        """
+        try:
+            await page.wait_for_load_state("networkidle", timeout=timeout * 1000)
+        except PlaywrightTimeoutError:
+            pass
 
     async def get_tabs_info(self) -> list[TabInfo]:
         """Get information about all tabs"""
@@ -558,7 +570,7 @@ class Browser:
 
     async def handle_pdf_url_navigation(self):
         page = await self.get_current_page()
-        if is_pdf_url(page.url):
+        if await is_pdf_url_async(page.url):
             await asyncio.sleep(5)  # Long sleep to ensure PDF is loaded
             await page.keyboard.press("Escape")
             await asyncio.sleep(0.1)
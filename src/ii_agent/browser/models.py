@@ -14,14 +14,18 @@ class TabInfo(BaseModel):
     title: str
 
 
-class Coordinates(BaseModel):
+# Every interactive element carries four of these, so they are slotted
+# dataclasses rather than models; pydantic still validates them as fields
+@dataclass(slots=True)
+class Coordinates:
     x: int
     y: int
     width: Optional[int] = None
     height: Optional[int] = None
 
 
-class Rect(BaseModel):
+@dataclass(slots=True)
+class Rect:
     left: int
     top: int
     right: int
@@ -1,9 +1,12 @@
+import asyncio
 import base64
 import logging
+import numpy as np
 import requests
+from functools import lru_cache
 from io import BytesIO
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 from urllib.parse import urlparse
 from PIL import Image, ImageDraw, ImageFont
 
@@ -11,6 +14,51 @@ from ii_agent.browser.models import InteractiveElement, Rect
 
 logger = logging.getLogger(__name__)
 
+# Colors (RGB format for PIL)
+HIGHLIGHT_BASE_COLORS = [
+    (204, 0, 0),
+    (0, 136, 0),
+    (0, 0, 204),
+    (204, 112, 0),
+    (102, 0, 102),
+    (0, 102, 102),
+    (204, 51, 153),
+    (44, 0, 102),
+    (204, 35, 0),
+    (28, 102, 66),
+    (170, 0, 0),
+    (36, 82, 123),
+]
+
+
+def generate_unique_color(base_color, element_idx):
+    """Generate a unique color variation based on element index"""
+    r, g, b = base_color
+    # Use prime numbers to create deterministic but non-repeating patterns
+    offset_r = (element_idx * 17) % 31 - 15  # Range: -15 to 15
+    offset_g = (element_idx * 23) % 29 - 14  # Range: -14 to 14
+    offset_b = (element_idx * 13) % 27 - 13  # Range: -13 to 13
+
+    # Ensure RGB values stay within 0-255 range
+    r = max(0, min(255, r + offset_r))
+    g = max(0, min(255, g + offset_g))
+    b = max(0, min(255, b + offset_b))
+
+    return (r, g, b)
+
+
+@lru_cache(maxsize=None)
+def _get_label_font() -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Load the label font once instead of parsing it for every screenshot."""
+    # Load custom font from the package
+    try:
+        # Path to your packaged font
+        font_path = Path(__file__).parent / "fonts" / "OpenSans-Medium.ttf"
+        return ImageFont.truetype(str(font_path), 11)
+    except Exception as e:
+        logger.warning(f"Could not load custom font: {e}, falling back to default")
+        return ImageFont.load_default()
+
 
 def put_highlight_elements_on_screenshot(
     elements: dict[int, InteractiveElement], screenshot_b64: str
@@ -22,46 +70,10 @@ def put_highlight_elements_on_screenshot(
         image = Image.open(BytesIO(image_data))
         draw = ImageDraw.Draw(image)
 
-        # Colors (RGB format for PIL)
-        base_colors = [
-            (204, 0, 0),
-            (0, 136, 0),
-            (0, 0, 204),
-            (204, 112, 0),
-            (102, 0, 102),
-            (0, 102, 102),
-            (204, 51, 153),
-            (44, 0, 102),
-            (204, 35, 0),
-            (28, 102, 66),
-            (170, 0, 0),
-            (36, 82, 123),
-        ]
         placed_labels = []
+        img_width, img_height = image.size
 
-        def generate_unique_color(base_color, element_idx):
-            """Generate a unique color variation based on element index"""
-            r, g, b = base_color
-            # Use prime numbers to create deterministic but non-repeating patterns
-            offset_r = (element_idx * 17) % 31 - 15  # Range: -15 to 15
-            offset_g = (element_idx * 23) % 29 - 14  # Range: -14 to 14
-            offset_b = (element_idx * 13) % 27 - 13  # Range: -13 to 13
-
-            # Ensure RGB values stay within 0-255 range
-            r = max(0, min(255, r + offset_r))
-            g = max(0, min(255, g + offset_g))
-            b = max(0, min(255, b + offset_b))
-
-            return (r, g, b)
-
-        # Load custom font from the package
-        try:
-            # Path to your packaged font
-            font_path = Path(__file__).parent / "fonts" / "OpenSans-Medium.ttf"
-            font = ImageFont.truetype(str(font_path), 11)
-        except Exception as e:
-            logger.warning(f"Could not load custom font: {e}, falling back to default")
-            font = ImageFont.load_default()
+        font = _get_label_font()
 
         for idx, element in elements.items():
             # don't draw sheets elements
@@ -70,7 +82,7 @@ def put_highlight_elements_on_screenshot(
             ) or element.browser_agent_id.startswith("column_"):
                 continue
 
-            base_color = base_colors[idx % len(base_colors)]
+            base_color = HIGHLIGHT_BASE_COLORS[idx % len(HIGHLIGHT_BASE_COLORS)]
             color = generate_unique_color(base_color, idx)
 
             rect = element.rect
@@ -123,7 +135,6 @@ def put_highlight_elements_on_screenshot(
                     break
 
             # Ensure label is visible within image boundaries
-            img_width, img_height = image.size
             if label_x < 0:
                 label_x = 0
             elif label_x + label_width >= img_width:
@@ -152,7 +163,7 @@ def put_highlight_elements_on_screenshot(
         # Convert back to base64
         buffer = BytesIO()
         image.save(buffer, format="PNG")
-        new_image_base64 = base64.b64encode(buffer.getvalue()).decode()
+        new_image_base64 = base64.b64encode(buffer.getbuffer()).decode()
 
         return new_image_base64
 
@@ -161,17 +172,22 @@ def put_highlight_elements_on_screenshot(
         return screenshot_b64
 
 
-def scale_b64_image(image_b64: str, scale_factor: float) -> str:
+def scale_b64_image(image_b64: str, scale_factor: Optional[float]) -> str:
     """
     Scale down a base64 encoded image using Pillow.
 
     Args:
         image_b64: Base64 encoded image string
-        scale_factor: Factor to scale the image by (0.5 = half size)
+        scale_factor: Factor to scale the image by (0.5 = half size), or None
+            to keep the original size
 
     Returns:
         Base64 encoded scaled image
     """
+    # Nothing to resize; skip decoding the screenshot altogether
+    if scale_factor is None or scale_factor == 1:
+        return image_b64
+
     try:
         # Decode base64 to PIL Image
         image_data = base64.b64decode(image_b64)
@@ -193,7 +209,7 @@ def scale_b64_image(image_b64: str, scale_factor: float) -> str:
         # Convert back to base64
         buffer = BytesIO()
         resized_image.save(buffer, format="PNG")
-        resized_image_b64 = base64.b64encode(buffer.getvalue()).decode()
+        resized_image_b64 = base64.b64encode(buffer.getbuffer()).decode()
 
         return resized_image_b64
 
@@ -257,6 +273,67 @@ def is_fully_contained(rect1: Rect, rect2: Rect) -> bool:
     )
 
 
+def _rects_to_soa(
+    rects: List[Rect],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Split rectangles into left, top, right and bottom coordinate arrays."""
+    coords = np.fromiter(
+        (value for r in rects for value in (r.left, r.top, r.right, r.bottom)),
+        dtype=np.float64,
+        count=4 * len(rects),
+    ).reshape(-1, 4)
+    return coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3]
+
+
+def _iou_matrix(
+    left: np.ndarray, top: np.ndarray, right: np.ndarray, bottom: np.ndarray
+) -> np.ndarray:
+    intersect_width = np.minimum(right[:, None], right[None, :]) - np.maximum(
+        left[:, None], left[None, :]
+    )
+    intersect_height = np.minimum(bottom[:, None], bottom[None, :]) - np.maximum(
+        top[:, None], top[None, :]
+    )
+    intersection_area = np.clip(intersect_width, 0, None) * np.clip(
+        intersect_height, 0, None
+    )
+
+    area = (right - left) * (bottom - top)
+    union_area = area[:, None] + area[None, :] - intersection_area
+
+    return np.divide(
+        intersection_area,
+        union_area,
+        out=np.zeros_like(intersection_area),
+        where=union_area > 0,
+    )
+
+
+def _containment_matrix(
+    left: np.ndarray, top: np.ndarray, right: np.ndarray, bottom: np.ndarray
+) -> np.ndarray:
+    # Entry [i, j] is is_fully_contained(rects[i], rects[j])
+    return (
+        (left[:, None] >= left[None, :])
+        & (right[:, None] <= right[None, :])
+        & (top[:, None] >= top[None, :])
+        & (bottom[:, None] <= bottom[None, :])
+    )
+
+
+def calculate_iou_matrix(rects: List[Rect]) -> np.ndarray:
+    """
+    Calculate the pairwise Intersection over Union of a list of rectangles.
+
+    Args:
+        rects: Rectangles with left, top, right, bottom keys
+
+    Returns:
+        N x N array where entry [i, j] equals calculate_iou(rects[i], rects[j])
+    """
+    return _iou_matrix(*_rects_to_soa(rects))
+
+
 def filter_overlapping_elements(
     elements: List[InteractiveElement], iou_threshold: float = 0.7
 ) -> List[InteractiveElement]:
@@ -281,41 +358,59 @@ def filter_overlapping_elements(
         )
     )
 
-    filtered_elements: List[InteractiveElement] = []
+    # Compare every pair in one pass. Only pairs that overlap or nest can
+    # affect each other, so the loop below only visits those
+    coords = _rects_to_soa([e.rect for e in elements])
+    overlaps = _iou_matrix(*coords) > iou_threshold
+    contained = _containment_matrix(*coords)
+    rows, cols = np.nonzero(np.tril(overlaps | contained, k=-1))
+
+    # For each element, the earlier elements it interacts with, in order
+    candidates: List[List[Tuple[int, bool, bool]]] = [[] for _ in elements]
+    for i, j, overlap, inside in zip(
+        rows.tolist(),
+        cols.tolist(),
+        overlaps[rows, cols].tolist(),
+        contained[rows, cols].tolist(),
+    ):
+        candidates[i].append((j, overlap, inside))
+
+    areas = [e.rect.width * e.rect.height for e in elements]
+    weights = [e.weight for e in elements]
+    z_indices = [e.z_index for e in elements]
+
+    # Elements are added in index order, so the kept ones stay in that order
+    kept = [False] * len(elements)
 
     # Add elements one by one, checking against already added elements
-    for current in elements:
+    for i in range(len(elements)):
         should_add = True
 
         # For each element already in our filtered list
-        for existing in filtered_elements:
+        for j, overlap, inside in candidates[i]:
+            if not kept[j]:
+                continue
+
             # Check overlap with IoU
-            iou = calculate_iou(current.rect, existing.rect)
-            if iou > iou_threshold:
+            if overlap:
                 should_add = False
                 break
 
             # Check if current element is fully contained within an existing element with higher weight
-            if is_fully_contained(current.rect, existing.rect):
-                if (
-                    existing.weight >= current.weight
-                    and existing.z_index == current.z_index
-                ):
+            if inside:
+                if weights[j] >= weights[i] and z_indices[j] == z_indices[i]:
                     should_add = False
                     break
                 else:
                     # If current element has higher weight and is more than 50% of the size of the existing element, remove the existing element
-                    if (
-                        current.rect.width * current.rect.height
-                        >= existing.rect.width * existing.rect.height * 0.5
-                    ):
-                        filtered_elements.remove(existing)
+                    if areas[i] >= areas[j] * 0.5:
+                        kept[j] = False
                         break
 
         if should_add:
-            filtered_elements.append(current)
+            kept[i] = True
 
-    return filtered_elements
+    return [element for element, keep in zip(elements, kept) if keep]
 
 
 def sort_elements_by_position(
@@ -336,39 +431,17 @@ def sort_elements_by_position(
     # Define what "same row" means
     ROW_THRESHOLD = 20  # pixels
 
-    # First, group elements into rows based on Y position
-    rows = []
-    current_row = []
-
-    # Copy and sort elements by Y position
-    sorted_by_y = sorted(elements, key=lambda e: e.rect.top)
-
-    # Group into rows
-    for element in sorted_by_y:
-        if not current_row:
-            # Start a new row
-            current_row.append(element)
-        else:
-            # Check if this element is in the same row as the previous ones
-            last_element = current_row[-1]
-            if abs(element.rect.top - last_element.rect.top) <= ROW_THRESHOLD:
-                # Same row
-                current_row.append(element)
-            else:
-                # New row
-                rows.append(list(current_row))
-                current_row = [element]
-
-    # Add the last row if not empty
-    if current_row:
-        rows.append(current_row)
+    left, top, _, _ = _rects_to_soa([e.rect for e in elements])
 
-    # Sort each row by X position (left to right)
-    for row in rows:
-        row.sort(key=lambda e: e.rect.left)
+    # Sort by Y position, then start a new row wherever the gap to the
+    # previous element exceeds the threshold
+    by_y = np.argsort(top, kind="stable")
+    row_ids = np.concatenate(([0], np.cumsum(np.diff(top[by_y]) > ROW_THRESHOLD)))
 
-    # Flatten the rows back into a single array
-    elements = [element for row in rows for element in row]
+    # Sort each row by X position (left to right); lexsort is stable, so
+    # elements at the same X keep their Y order
+    order = by_y[np.lexsort((left[by_y], row_ids))]
+    elements = [elements[i] for i in order.tolist()]
 
     for i, element in enumerate(elements):
         element.index = i
@@ -398,6 +471,35 @@ def filter_elements(
     return sorted_elements
 
 
+# Shared across probes so repeat checks against a host reuse its connection
+_http_session = requests.Session()
+_http_adapter = requests.adapters.HTTPAdapter(pool_connections=32, pool_maxsize=64)
+_http_session.mount("http://", _http_adapter)
+_http_session.mount("https://", _http_adapter)
+
+
+def _has_pdf_content_type(response: requests.Response) -> bool:
+    content_type = response.headers.get("Content-Type", "").lower()
+    return "application/pdf" in content_type
+
+
+@lru_cache(maxsize=1024)
+def _is_pdf_content_type(url: str, timeout: float) -> bool:
+    """Check the Content-Type a URL is served with, caching the answer per URL."""
+    # HEAD leaves the pooled connection reusable
+    response = _http_session.head(url, allow_redirects=True, timeout=timeout)
+    if response.ok and _has_pdf_content_type(response):
+        return True
+
+    # Fallback: a streamed GET returns once the headers arrive, and the body
+    # is never read
+    response = _http_session.get(url, stream=True, timeout=timeout)
+    response.close()
+    # Error statuses raise instead of returning, so they are not cached
+    response.raise_for_status()
+    return _has_pdf_content_type(response)
+
+
 def is_pdf_url(url: str, timeout: float = 5.0) -> bool:
     """
     Checks if a given URL points to a PDF file.
@@ -415,17 +517,23 @@ def is_pdf_url(url: str, timeout: float = 5.0) -> bool:
         if parsed.path.lower().endswith(".pdf"):
             return True
 
-        # Try HEAD request to get Content-Type
-        head = requests.head(url, allow_redirects=True, timeout=timeout)
-        content_type = head.headers.get("Content-Type", "").lower()
-        if "application/pdf" in content_type:
-            return True
-
-        # Fallback: Try a minimal GET request
-        get = requests.get(url, stream=True, timeout=timeout)
-        content_type = get.headers.get("Content-Type", "").lower()
-        return "application/pdf" in content_type
+        # Failed requests raise, so only real answers are cached
+        return _is_pdf_content_type(url, timeout)
 
     except requests.RequestException:
         # Log or handle as needed in real prod code
         return False
+
+
+async def is_pdf_url_async(url: str, timeout: float = 5.0) -> bool:
+    """
+    Checks if a given URL points to a PDF file without blocking the event loop.
+
+    Args:
+        url (str): The URL to check.
+        timeout (float): Timeout for HTTP requests.
+
+    Returns:
+        bool: True if the URL points to a PDF, False otherwise.
+    """
+    return await asyncio.to_thread(is_pdf_url, url, timeout)
@@ -2,6 +2,8 @@ from pydantic import BaseModel
 from typing import Any
 import enum
 
+from ii_agent.utils.json_utils import json_dumps
+
 
 class EventType(str, enum.Enum):
     CONNECTION_ESTABLISHED = "connection_established"
@@ -27,3 +29,15 @@ class EventType(str, enum.Enum):
 class RealtimeEvent(BaseModel):
     type: EventType
     content: dict[str, Any]
+
+
+# Everything in an event frame but its content is fixed per event type
+_FRAME_PREFIXES = {
+    event_type: f'{{"type":{json_dumps(event_type.value)},"content":'
+    for event_type in EventType
+}
+
+
+def encode_event(event_type: EventType, content: dict[str, Any]) -> str:
+    """Encode an event as the JSON text of its RealtimeEvent.model_dump()."""
+    return _FRAME_PREFIXES[event_type] + json_dumps(content) + "}"
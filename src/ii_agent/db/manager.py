@@ -1,28 +1,63 @@
 from contextlib import contextmanager
-from typing import Optional, Generator
+from typing import Optional, Generator, Union
 import uuid
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import Connection, Engine, bindparam, create_engine, select
 from sqlalchemy.orm import sessionmaker, Session as DBSession
 from ii_agent.db.models import Base, Session, Event
 from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.utils.json_utils import json_dumps, json_loads
+
+
+# Session lookups are built once; only their bound parameters change per call
+_SESSION_BY_ID = select(Session).where(Session.id == bindparam("id"))
+_SESSION_BY_WORKSPACE = select(Session).where(
+    Session.workspace_dir == bindparam("workspace_dir")
+)
+_SESSION_BY_DEVICE_ID = select(Session).where(
+    Session.device_id == bindparam("device_id")
+)
 
 
 class DatabaseManager:
     """Manager class for database operations."""
 
-    def __init__(self, db_path: str = "events.db"):
+    def __init__(
+        self,
+        db_path: str = "events.db",
+        engine: Optional[Union[Engine, Connection]] = None,
+    ):
         """Initialize the database manager.
 
         Args:
             db_path: Path to the SQLite database file
+            engine: Engine or connection to use instead of opening db_path
         """
-        self.engine = create_engine(f"sqlite:///{db_path}")
+        if engine is None:
+            # Event payloads are JSON columns; encode and decode them with orjson
+            engine = create_engine(
+                f"sqlite:///{db_path}",
+                json_serializer=json_dumps,
+                json_deserializer=json_loads,
+            )
+        self.engine = engine
         self.SessionFactory = sessionmaker(bind=self.engine)
 
         # Create tables if they don't exist
         Base.metadata.create_all(self.engine)
 
+    @classmethod
+    def from_engine(cls, engine: Union[Engine, Connection]) -> "DatabaseManager":
+        """Create a database manager on an existing engine or connection.
+
+        Args:
+            engine: The engine or connection to bind sessions to
+
+        Returns:
+            A database manager using the given engine
+        """
+        return cls(engine=engine)
+
     @contextmanager
     def get_session(self) -> Generator[DBSession, None, None]:
         """Get a database session as a context manager.
@@ -87,6 +122,31 @@ class DatabaseManager:
             session.flush()  # This will populate the id field
             return uuid.UUID(db_event.id)
 
+    def save_events(
+        self, session_id: uuid.UUID, events: list[RealtimeEvent]
+    ) -> list[uuid.UUID]:
+        """Save several events to the database in a single transaction.
+
+        Args:
+            session_id: The UUID of the session these events belong to
+            events: The events to save, in order
+
+        Returns:
+            The UUIDs of the created events, in the same order
+        """
+        with self.get_session() as session:
+            db_events = [
+                Event(
+                    session_id=session_id,
+                    event_type=event.type.value,
+                    event_payload=event.model_dump(),
+                )
+                for event in events
+            ]
+            session.add_all(db_events)
+            session.flush()  # This will populate the id fields
+            return [uuid.UUID(db_event.id) for db_event in db_events]
+
     def get_session_events(self, session_id: uuid.UUID) -> list[Event]:
         """Get all events for a session.
 
@@ -112,8 +172,10 @@ class DatabaseManager:
         """
         with self.get_session() as session:
             return (
-                session.query(Session)
-                .filter(Session.workspace_dir == workspace_dir)
+                session.execute(
+                    _SESSION_BY_WORKSPACE, {"workspace_dir": workspace_dir}
+                )
+                .scalars()
                 .first()
             )
 
@@ -127,7 +189,11 @@ class DatabaseManager:
             The session if found, None otherwise
         """
         with self.get_session() as session:
-            return session.query(Session).filter(Session.id == str(session_id)).first()
+            return (
+                session.execute(_SESSION_BY_ID, {"id": str(session_id)})
+                .scalars()
+                .first()
+            )
 
     def get_session_by_device_id(self, device_id: str) -> Optional[Session]:
         """Get a session by its device ID.
@@ -139,7 +205,11 @@ class DatabaseManager:
             The session if found, None otherwise
         """
         with self.get_session() as session:
-            return session.query(Session).filter(Session.device_id == device_id).first()
+            return (
+                session.execute(_SESSION_BY_DEVICE_ID, {"device_id": device_id})
+                .scalars()
+                .first()
+            )
 
     def delete_session_events(self, session_id: uuid.UUID) -> None:
         """Delete all events for a session.
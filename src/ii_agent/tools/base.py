@@ -104,4 +104,15 @@ class LLMTool(ABC):
         Raises:
             jsonschema.ValidationError: If the tool input is invalid.
         """
-        jsonschema.validate(instance=tool_input, schema=self.input_schema)
+        # Same checks as jsonschema.validate(), but the schema is only checked
+        # against its metaschema and compiled once per tool instead of per call
+        validator = getattr(self, "_input_validator", None)
+        if validator is None or validator.schema is not self.input_schema:
+            validator_cls = jsonschema.validators.validator_for(self.input_schema)
+            validator_cls.check_schema(self.input_schema)
+            validator = validator_cls(self.input_schema)
+            self._input_validator = validator
+
+        error = jsonschema.exceptions.best_match(validator.iter_errors(tool_input))
+        if error is not None:
+            raise error
@@ -1,5 +1,3 @@
-import asyncio
-
 from typing import Any, Optional
 from ii_agent.tools.base import (
     LLMTool,
@@ -7,17 +5,7 @@ from ii_agent.tools.base import (
 )
 from ii_agent.browser.browser import Browser
 from ii_agent.llm.message_history import MessageHistory
-
-
-def get_event_loop():
-    try:
-        # Try to get the existing event loop
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        # If no event loop exists, create a new one
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    return loop
+from ii_agent.utils.event_loop import run_coroutine_sync
 
 
 class BrowserTool(LLMTool):
@@ -36,5 +24,4 @@ class BrowserTool(LLMTool):
         tool_input: dict[str, Any],
         message_history: Optional[MessageHistory] = None,
     ) -> ToolImplOutput:
-        loop = get_event_loop()
-        return loop.run_until_complete(self._run(tool_input, message_history))
+        return run_coroutine_sync(self._run(tool_input, message_history))
@@ -1,5 +1,3 @@
-import asyncio
-
 from typing import Any, Optional
 from playwright.async_api import TimeoutError
 from ii_agent.browser.browser import Browser
@@ -35,7 +33,7 @@ class BrowserNavigationTool(BrowserTool):
         page = await self.browser.get_current_page()
         try:
             await page.goto(url, wait_until="domcontentloaded")
-            await asyncio.sleep(1.5)
+            await self.browser.wait_for_page_settle(page, timeout=1.5)
         except TimeoutError:
             msg = f"Timeout error navigating to {url}"
             return ToolImplOutput(msg, msg)
@@ -79,7 +77,7 @@ class BrowserRestartTool(BrowserTool):
         page = await self.browser.get_current_page()
         try:
             await page.goto(url, wait_until="domcontentloaded")
-            await asyncio.sleep(1.5)
+            await self.browser.wait_for_page_settle(page, timeout=1.5)
         except TimeoutError:
             msg = f"Timeout error navigating to {url}"
             return ToolImplOutput(msg, msg)
@@ -3,7 +3,7 @@ import asyncio
 from typing import Any, Optional
 from ii_agent.tools.browser_tools import BrowserTool, utils
 from ii_agent.browser.browser import Browser
-from ii_agent.browser.utils import is_pdf_url
+from ii_agent.browser.utils import is_pdf_url_async
 from ii_agent.tools.base import ToolImplOutput
 from ii_agent.llm.message_history import MessageHistory
 
@@ -23,7 +23,7 @@ class BrowserScrollDownTool(BrowserTool):
     ) -> ToolImplOutput:
         page = await self.browser.get_current_page()
         state = self.browser.get_state()
-        is_pdf = is_pdf_url(page.url)
+        is_pdf = await is_pdf_url_async(page.url)
         if is_pdf:
             await page.keyboard.press("PageDown")
             await asyncio.sleep(0.1)
@@ -54,7 +54,7 @@ class BrowserScrollUpTool(BrowserTool):
     ) -> ToolImplOutput:
         page = await self.browser.get_current_page()
         state = self.browser.get_state()
-        is_pdf = is_pdf_url(page.url)
+        is_pdf = await is_pdf_url_async(page.url)
         if is_pdf:
             await page.keyboard.press("PageUp")
             await asyncio.sleep(0.1)
@@ -5,7 +5,7 @@ from ii_agent.llm.message_history import MessageHistory
 from ii_agent.tools.base import LLMTool, ToolImplOutput
 from ii_researcher.reasoning.agent import ReasoningAgent
 from ii_researcher.reasoning.builders.report import ReportType
-import asyncio
+from ii_agent.utils.event_loop import run_coroutine_sync
 
 
 def on_token(token: str):
@@ -13,17 +13,6 @@ def on_token(token: str):
     print(token, end="", flush=True)
 
 
-def get_event_loop():
-    try:
-        # Try to get the existing event loop
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        # If no event loop exists, create a new one
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    return loop
-
-
 class DeepResearchTool(LLMTool):
     name = "deep_research"
     """The model should call this tool when it needs to perform a deep research on a complex topic. This tool is good for providing a comprehensive survey and deep analysis of a topic or niche answers that are hard to find with single search. You can also use this tool to gain large amount of context information."""
@@ -60,9 +49,7 @@ class DeepResearchTool(LLMTool):
         agent = ReasoningAgent(
             question=tool_input["query"], report_type=ReportType.BASIC
         )
-        result = get_event_loop().run_until_complete(
-            agent.run(on_token=on_token, is_stream=True)
-        )
+        result = run_coroutine_sync(agent.run(on_token=on_token, is_stream=True))
 
         assert result, "Model returned empty answer"
         self.answer = result
@@ -20,33 +20,9 @@ from ii_agent.tools.sequential_thinking_tool import SequentialThinkingTool
 from ii_agent.tools.message_tool import MessageTool
 from ii_agent.tools.complete_tool import CompleteTool, ReturnControlToUserTool
 from ii_agent.tools.bash_tool import create_bash_tool, create_docker_bash_tool
-from ii_agent.browser.browser import Browser
 from ii_agent.utils import WorkspaceManager
 from ii_agent.llm.message_history import MessageHistory
-from ii_agent.tools.browser_tools import (
-    BrowserNavigationTool,
-    BrowserRestartTool,
-    BrowserScrollDownTool,
-    BrowserScrollUpTool,
-    BrowserViewTool,
-    BrowserWaitTool,
-    BrowserSwitchTabTool,
-    BrowserOpenNewTabTool,
-    BrowserClickTool,
-    BrowserEnterTextTool,
-    BrowserPressKeyTool,
-    BrowserGetSelectOptionsTool,
-    BrowserSelectDropdownOptionTool,
-)
 from ii_agent.tools.visualizer import DisplayImageTool
-from ii_agent.tools.advanced_tools.audio_tool import (
-    AudioTranscribeTool,
-    AudioGenerateTool,
-)
-from ii_agent.tools.advanced_tools.video_gen_tool import VideoGenerateFromTextTool
-from ii_agent.tools.advanced_tools.image_gen_tool import ImageGenerateTool
-from ii_agent.tools.advanced_tools.pdf_tool import PdfTextExtractTool
-from ii_agent.tools.deep_research_tool import DeepResearchTool
 from ii_agent.tools.list_html_links_tool import ListHtmlLinksTool
 
 
@@ -61,6 +37,10 @@ def get_system_tools(
     """
     Retrieves a list of all system tools.
 
+    Tools that are only enabled through tool_args are imported where they are
+    created, since several of them pull in large SDKs (Vertex AI, Playwright,
+    ii-researcher) that most sessions never use.
+
     Returns:
         list[LLMTool]: A list of all system tools.
     """
@@ -108,19 +88,34 @@ def get_system_tools(
         if tool_args.get("sequential_thinking", False):
             tools.append(SequentialThinkingTool())
         if tool_args.get("deep_research", False):
+            from ii_agent.tools.deep_research_tool import DeepResearchTool
+
             tools.append(DeepResearchTool())
         if tool_args.get("pdf", False):
+            from ii_agent.tools.advanced_tools.pdf_tool import PdfTextExtractTool
+
             tools.append(PdfTextExtractTool(workspace_manager=workspace_manager))
         if tool_args.get("media_generation", False) and (
             os.environ.get("GOOGLE_CLOUD_PROJECT")
             and os.environ.get("GOOGLE_CLOUD_REGION")
         ):
+            from ii_agent.tools.advanced_tools.image_gen_tool import ImageGenerateTool
+
             tools.append(ImageGenerateTool(workspace_manager=workspace_manager))
             if tool_args.get("video_generation", False):
+                from ii_agent.tools.advanced_tools.video_gen_tool import (
+                    VideoGenerateFromTextTool,
+                )
+
                 tools.append(VideoGenerateFromTextTool(workspace_manager=workspace_manager))
         if tool_args.get("audio_generation", False) and (
             os.environ.get("OPEN_API_KEY") and os.environ.get("AZURE_OPENAI_ENDPOINT")
         ):
+            from ii_agent.tools.advanced_tools.audio_tool import (
+                AudioTranscribeTool,
+                AudioGenerateTool,
+            )
+
             tools.extend(
                 [
                     AudioTranscribeTool(workspace_manager=workspace_manager),
@@ -130,6 +125,23 @@ def get_system_tools(
             
         # Browser tools
         if tool_args.get("browser", False):
+            from ii_agent.browser.browser import Browser
+            from ii_agent.tools.browser_tools import (
+                BrowserNavigationTool,
+                BrowserRestartTool,
+                BrowserScrollDownTool,
+                BrowserScrollUpTool,
+                BrowserViewTool,
+                BrowserWaitTool,
+                BrowserSwitchTabTool,
+                BrowserOpenNewTabTool,
+                BrowserClickTool,
+                BrowserEnterTextTool,
+                BrowserPressKeyTool,
+                BrowserGetSelectOptionsTool,
+                BrowserSelectDropdownOptionTool,
+            )
+
             browser = Browser()
             tools.extend(
                 [
@@ -0,0 +1,38 @@
+"""A shared event loop for running async code from synchronous tools.
+
+Tools run in worker threads (the agent itself runs via anyio.to_thread), but
+some of them wrap async libraries. Rather than giving every worker thread its
+own loop, they all submit their coroutines to one long-lived loop. Objects
+bound to a loop, such as Playwright pages, therefore stay usable no matter
+which worker thread calls the tool next.
+"""
+
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name="tool-event-loop", daemon=True
+            ).start()
+            _loop = loop
+    return _loop
+
+
+def run_coroutine_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Run coro on the shared loop and block the calling thread until it ends.
+
+    Must not be called from the shared loop's own thread.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, get_background_loop()).result()
@@ -0,0 +1,26 @@
+"""Fast JSON helpers for the websocket hot path.
+
+Payloads orjson refuses (e.g. integers wider than 64 bits) fall back to the
+standard library encoder, so the output is always valid JSON text.
+"""
+
+import json
+from typing import Any
+
+import orjson
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def json_dumps(obj: Any) -> str:
+    """Serialize obj to a compact JSON string."""
+    try:
+        return orjson.dumps(obj, option=_ORJSON_OPTIONS).decode()
+    except orjson.JSONEncodeError:
+        # Same framing as Starlette's WebSocket.send_json().
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def json_loads(data: str | bytes) -> Any:
+    """Parse a JSON document from a str or bytes payload."""
+    return orjson.loads(data)
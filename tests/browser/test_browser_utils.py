@@ -0,0 +1,244 @@
+"""Tests for the browser element geometry helpers."""
+
+import asyncio
+import base64
+import random
+import unittest
+from io import BytesIO
+from unittest.mock import patch
+
+import requests
+from PIL import Image
+
+from ii_agent.browser.models import Coordinates, InteractiveElement, Rect
+from ii_agent.browser.utils import (
+    calculate_iou,
+    calculate_iou_matrix,
+    _http_session,
+    _is_pdf_content_type,
+    filter_overlapping_elements,
+    is_pdf_url,
+    is_pdf_url_async,
+    scale_b64_image,
+    sort_elements_by_position,
+)
+
+
+def make_rect(left, top, right, bottom):
+    return Rect(
+        left=left,
+        top=top,
+        right=right,
+        bottom=bottom,
+        width=right - left,
+        height=bottom - top,
+    )
+
+
+def make_element(index, rect, weight=1.0, z_index=0):
+    coordinates = Coordinates(x=rect.left, y=rect.top)
+    return InteractiveElement(
+        index=index,
+        tag_name="button",
+        text=f"Button {index}",
+        attributes={},
+        viewport=coordinates,
+        page=coordinates,
+        center=coordinates,
+        weight=weight,
+        browser_agent_id=f"button_{index}",
+        rect=rect,
+        z_index=z_index,
+    )
+
+
+class TestBrowserUtils(unittest.TestCase):
+    """Test cases for the element overlap filtering."""
+
+    def test_iou_matrix_matches_scalar(self):
+        """Test that every matrix entry equals the pairwise calculate_iou."""
+        rng = random.Random(0)
+        rects = []
+        for _ in range(40):
+            left, top = rng.randint(0, 200), rng.randint(0, 200)
+            rects.append(
+                make_rect(left, top, left + rng.randint(0, 80), top + rng.randint(0, 80))
+            )
+
+        matrix = calculate_iou_matrix(rects)
+
+        self.assertEqual(matrix.shape, (40, 40))
+        for i, rect1 in enumerate(rects):
+            for j, rect2 in enumerate(rects):
+                self.assertEqual(matrix[i, j], calculate_iou(rect1, rect2))
+
+    def test_iou_matrix_empty(self):
+        """Test that no rectangles give an empty matrix."""
+        self.assertEqual(calculate_iou_matrix([]).shape, (0, 0))
+
+    def test_filter_drops_overlapping_duplicate(self):
+        """Test that a near-duplicate of a larger element is filtered out."""
+        large = make_element(0, make_rect(0, 0, 100, 100))
+        duplicate = make_element(1, make_rect(0, 0, 100, 95))
+        separate = make_element(2, make_rect(200, 200, 250, 250))
+
+        filtered = filter_overlapping_elements([duplicate, separate, large])
+
+        self.assertEqual(filtered, [large, separate])
+
+    def test_filter_keeps_heavier_contained_element(self):
+        """Test that a heavier element replaces a container of similar size."""
+        container = make_element(0, make_rect(0, 0, 100, 100), weight=1.0)
+        inner = make_element(1, make_rect(0, 0, 100, 60), weight=2.0)
+
+        filtered = filter_overlapping_elements([container, inner])
+
+        self.assertEqual(filtered, [inner])
+
+    def test_filter_drops_lighter_contained_element(self):
+        """Test that a lighter element inside a container is dropped."""
+        container = make_element(0, make_rect(0, 0, 100, 100), weight=2.0)
+        inner = make_element(1, make_rect(10, 10, 30, 30), weight=1.0)
+
+        filtered = filter_overlapping_elements([inner, container])
+
+        self.assertEqual(filtered, [container])
+
+    def test_sort_groups_rows_then_orders_by_x(self):
+        """Test that elements within ROW_THRESHOLD of each other share a row."""
+        elements = [
+            make_element(0, make_rect(300, 12, 320, 30)),
+            make_element(1, make_rect(10, 100, 30, 120)),
+            make_element(2, make_rect(100, 0, 120, 20)),
+            make_element(3, make_rect(50, 30, 70, 50)),
+            make_element(4, make_rect(0, 90, 20, 110)),
+        ]
+
+        sorted_elements = sort_elements_by_position(elements)
+
+        # Tops 0, 12 and 30 chain into one row; 90 and 100 form the next
+        self.assertEqual(
+            [e.browser_agent_id for e in sorted_elements],
+            ["button_3", "button_2", "button_0", "button_4", "button_1"],
+        )
+        self.assertEqual([e.index for e in sorted_elements], [0, 1, 2, 3, 4])
+
+    def test_sort_empty(self):
+        """Test that sorting no elements returns an empty list."""
+        self.assertEqual(sort_elements_by_position([]), [])
+
+
+class TestIsPdfUrl(unittest.TestCase):
+    """Test cases for is_pdf_url."""
+
+    def setUp(self):
+        _is_pdf_content_type.cache_clear()
+        head_patcher = patch.object(_http_session, "head")
+        get_patcher = patch.object(_http_session, "get")
+        self.mock_head = head_patcher.start()
+        self.mock_get = get_patcher.start()
+        self.addCleanup(head_patcher.stop)
+        self.addCleanup(get_patcher.stop)
+
+    def set_content_type(self, content_type, status_code=200, mock=None):
+        response = (mock or self.mock_head).return_value
+        response.status_code = status_code
+        response.ok = status_code < 400
+        response.headers = {"Content-Type": content_type}
+        if status_code >= 400:
+            response.raise_for_status.side_effect = requests.HTTPError()
+        else:
+            response.raise_for_status.side_effect = None
+
+    def test_by_extension(self):
+        """Test that a .pdf path is recognised without a request."""
+        self.assertTrue(is_pdf_url("https://example.com/paper.PDF?download=1"))
+        self.mock_head.assert_not_called()
+
+    def test_by_content_type(self):
+        """Test that the Content-Type header decides for other URLs."""
+        self.set_content_type("application/pdf; charset=binary")
+        self.assertTrue(is_pdf_url("https://example.com/download"))
+
+        self.set_content_type("text/html")
+        self.set_content_type("text/html", mock=self.mock_get)
+        self.assertFalse(is_pdf_url("https://example.com/page"))
+
+    def test_result_is_cached(self):
+        """Test that a URL is only probed once."""
+        self.set_content_type("application/pdf")
+
+        self.assertTrue(is_pdf_url("https://example.com/download"))
+        self.assertTrue(is_pdf_url("https://example.com/download"))
+
+        self.mock_head.assert_called_once()
+
+    def test_falls_back_to_get_without_head(self):
+        """Test that servers rejecting HEAD are probed with a streamed GET."""
+        self.set_content_type("", status_code=405)
+        self.mock_get.return_value.headers = {"Content-Type": "application/pdf"}
+
+        self.assertTrue(is_pdf_url("https://example.com/download"))
+
+        self.mock_get.assert_called_once_with(
+            "https://example.com/download", stream=True, timeout=5.0
+        )
+        self.mock_get.return_value.close.assert_called_once()
+
+    def test_falls_back_to_get_when_head_is_not_pdf(self):
+        """Test that a non-PDF HEAD answer is checked again with a GET."""
+        self.set_content_type("text/html")
+        self.set_content_type("application/pdf", mock=self.mock_get)
+
+        self.assertTrue(is_pdf_url("https://example.com/download"))
+        self.mock_get.assert_called_once()
+
+    def test_error_status_is_not_cached(self):
+        """Test that an error response returns False and is retried later."""
+        self.set_content_type("text/html", status_code=503)
+        self.set_content_type("text/html", status_code=503, mock=self.mock_get)
+        self.assertFalse(is_pdf_url("https://example.com/download"))
+
+        self.set_content_type("application/pdf")
+        self.assertTrue(is_pdf_url("https://example.com/download"))
+
+    def test_request_error_is_not_cached(self):
+        """Test that a failed probe returns False and is retried later."""
+        self.mock_head.side_effect = requests.ConnectionError()
+        self.assertFalse(is_pdf_url("https://example.com/download"))
+
+        self.mock_head.side_effect = None
+        self.set_content_type("application/pdf")
+        self.assertTrue(is_pdf_url("https://example.com/download"))
+
+    def test_async_variant(self):
+        """Test that the async variant gives the same answer as is_pdf_url."""
+        self.set_content_type("application/pdf")
+
+        self.assertTrue(asyncio.run(is_pdf_url_async("https://example.com/download")))
+        self.mock_head.assert_called_once()
+
+
+class TestScaleB64Image(unittest.TestCase):
+    """Test cases for scale_b64_image."""
+
+    def setUp(self):
+        buffer = BytesIO()
+        Image.new("RGB", (100, 80), (255, 0, 0)).save(buffer, format="PNG")
+        self.image_b64 = base64.b64encode(buffer.getvalue()).decode()
+
+    def test_scales_image(self):
+        """Test that the image is resized by the scale factor."""
+        scaled = scale_b64_image(self.image_b64, 0.5)
+
+        image = Image.open(BytesIO(base64.b64decode(scaled)))
+        self.assertEqual(image.size, (50, 40))
+
+    def test_no_scale_returns_input(self):
+        """Test that no scale factor returns the screenshot untouched."""
+        self.assertIs(scale_b64_image(self.image_b64, None), self.image_b64)
+        self.assertIs(scale_b64_image(self.image_b64, 1), self.image_b64)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+"""Tests for the database manager."""
+
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import StaticPool
+
+from ii_agent.core.event import EventType, RealtimeEvent
+from ii_agent.db.manager import DatabaseManager
+from ii_agent.db.models import Base, Event
+
+
+class TestDatabaseManager(unittest.TestCase):
+    """Test cases for DatabaseManager."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create the in-memory database and its schema once."""
+        # StaticPool keeps the one connection, so every session sees the
+        # same in-memory database
+        cls.engine = create_engine(
+            "sqlite:///:memory:",
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+        Base.metadata.create_all(cls.engine)
+
+        # One manager, and so one sessionmaker, serves every test
+        cls.connection = cls.engine.connect()
+        cls.db_manager = DatabaseManager.from_engine(cls.connection)
+        cls.connection.commit()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.connection.close()
+        cls.engine.dispose()
+
+    def setUp(self):
+        """Run each test in a transaction that is rolled back afterwards."""
+        # Sessions bound to the connection join its transaction, so their
+        # commits never reach the database
+        self.transaction = self.connection.begin()
+
+        self.session_id = uuid.uuid4()
+        self.db_manager.create_session(
+            self.session_id, Path("/tmp/workspace"), device_id="device-1"
+        )
+
+    def tearDown(self):
+        self.transaction.rollback()
+
+    def _add_events(self, *event_types: EventType) -> None:
+        """Insert events one second apart in a single statement."""
+        start = datetime(2024, 1, 1)
+        with self.db_manager.get_session() as session:
+            session.execute(
+                Event.__table__.insert(),
+                [
+                    {
+                        "session_id": str(self.session_id),
+                        "event_type": event_type.value,
+                        "event_payload": {"type": event_type.value, "content": {}},
+                        "timestamp": start + timedelta(seconds=offset),
+                    }
+                    for offset, event_type in enumerate(event_types)
+                ],
+            )
+
+    def _event_types(self) -> list[str]:
+        with self.db_manager.get_session() as session:
+            return [
+                event.event_type
+                for event in session.query(Event)
+                .filter(Event.session_id == str(self.session_id))
+                .order_by(Event.timestamp)
+            ]
+
+    def test_init_creates_tables(self):
+        """Test that the manager creates the session and event tables."""
+        engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+        self.addCleanup(engine.dispose)
+        self.assertEqual(inspect(engine).get_table_names(), [])
+
+        DatabaseManager(engine=engine)
+
+        tables = inspect(engine).get_table_names()
+        self.assertIn("session", tables)
+        self.assertIn("event", tables)
+
+    def test_get_session_by_id_workspace_device_id(self):
+        """Test looking up a session by each of its keys."""
+        self.assertIsNotNone(self.db_manager.get_session_by_id(self.session_id))
+        self.assertIsNotNone(
+            self.db_manager.get_session_by_workspace("/tmp/workspace")
+        )
+        self.assertIsNotNone(self.db_manager.get_session_by_device_id("device-1"))
+
+        self.assertIsNone(self.db_manager.get_session_by_id(uuid.uuid4()))
+        self.assertIsNone(self.db_manager.get_session_by_workspace("/tmp/other"))
+        self.assertIsNone(self.db_manager.get_session_by_device_id("device-2"))
+
+    def test_save_event(self):
+        """Test that a saved event keeps its type and payload."""
+        event = RealtimeEvent(
+            type=EventType.USER_MESSAGE, content={"text": "Hello"}
+        )
+
+        event_id = self.db_manager.save_event(self.session_id, event)
+
+        with self.db_manager.get_session() as session:
+            saved = session.query(Event).filter(Event.id == str(event_id)).one()
+            self.assertEqual(saved.session_id, str(self.session_id))
+            self.assertEqual(saved.event_type, "user_message")
+            self.assertEqual(saved.event_payload, event.model_dump())
+
+    def test_save_events(self):
+        """Test that several events are saved in order in one call."""
+        events = [
+            RealtimeEvent(type=EventType.USER_MESSAGE, content={"text": "Hello"}),
+            RealtimeEvent(type=EventType.AGENT_RESPONSE, content={"text": "Hi"}),
+        ]
+
+        event_ids = self.db_manager.save_events(self.session_id, events)
+
+        self.assertEqual(len(event_ids), 2)
+        with self.db_manager.get_session() as session:
+            for event_id, event in zip(event_ids, events):
+                saved = session.query(Event).filter(Event.id == str(event_id)).one()
+                self.assertEqual(saved.event_payload, event.model_dump())
+
+    def test_delete_session_events(self):
+        """Test that all events of a session are deleted."""
+        self._add_events(EventType.USER_MESSAGE, EventType.AGENT_RESPONSE)
+
+        self.db_manager.delete_session_events(self.session_id)
+
+        self.assertEqual(self._event_types(), [])
+
+    def test_delete_events_from_last_to_user_message(self):
+        """Test that events from the last user message onwards are deleted."""
+        self._add_events(
+            EventType.USER_MESSAGE,
+            EventType.TOOL_CALL,
+            EventType.AGENT_RESPONSE,
+            EventType.USER_MESSAGE,
+            EventType.TOOL_CALL,
+            EventType.TOOL_RESULT,
+        )
+
+        self.db_manager.delete_events_from_last_to_user_message(self.session_id)
+
+        self.assertEqual(
+            self._event_types(), ["user_message", "tool_call", "agent_response"]
+        )
+
+    def test_delete_events_no_user_message(self):
+        """Test that all events are deleted when there is no user message."""
+        self._add_events(EventType.TOOL_CALL, EventType.AGENT_RESPONSE)
+
+        self.db_manager.delete_events_from_last_to_user_message(self.session_id)
+
+        self.assertEqual(self._event_types(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
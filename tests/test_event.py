@@ -0,0 +1,21 @@
+import json
+
+import pytest
+
+from ii_agent.core.event import EventType, RealtimeEvent, encode_event
+
+
+class TestEncodeEvent:
+    @pytest.mark.parametrize("event_type", list(EventType))
+    def test_matches_model_dump(self, event_type):
+        """Test that every event type encodes like RealtimeEvent.model_dump()."""
+        content = {"text": 'quote " and unicode é', "items": [1, None, True]}
+        event = RealtimeEvent(type=event_type, content=content)
+
+        assert json.loads(encode_event(event_type, content)) == json.loads(
+            event.model_dump_json()
+        )
+
+    def test_empty_content(self):
+        """Test that events without content still produce a valid frame."""
+        assert encode_event(EventType.PONG, {}) == '{"type":"pong","content":{}}'
@@ -0,0 +1,39 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ii_agent.utils.event_loop import get_background_loop, run_coroutine_sync
+
+
+async def _running_loop():
+    await asyncio.sleep(0)
+    return asyncio.get_running_loop()
+
+
+class TestRunCoroutineSync:
+    def test_returns_coroutine_result(self):
+        """Test that the coroutine's return value is handed back."""
+
+        async def add(a, b):
+            return a + b
+
+        assert run_coroutine_sync(add(1, 2)) == 3
+
+    def test_worker_threads_share_one_loop(self):
+        """Test that coroutines from different threads run on the same loop."""
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            loops = list(
+                pool.map(lambda _: run_coroutine_sync(_running_loop()), range(8))
+            )
+
+        assert all(loop is get_background_loop() for loop in loops)
+
+    def test_exceptions_propagate(self):
+        """Test that an exception raised by the coroutine reaches the caller."""
+
+        async def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            run_coroutine_sync(fail())
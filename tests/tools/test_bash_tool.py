@@ -21,19 +21,21 @@ from ii_agent.tools.bash_tool import (
 )
 
 
+@pytest.fixture(scope="module")
 def bash_tool():
+    """A BashTool shared by the tests that mock out command execution.
+
+    Spawning the persistent shell dominates these tests' runtime, so it is
+    done once per module rather than once per test.
+    """
     return BashTool(
         workspace_root=Path("/tmp"),
         require_confirmation=False,
     )
 
 
-def test_successful_command():
+def test_successful_command(bash_tool):
     """Test that a successful command returns the expected output."""
-    bash_tool = BashTool(
-        workspace_root=Path("/tmp"),
-        require_confirmation=False,
-    )
     with patch("ii_agent.tools.bash_tool.run_command") as mock_run_command:
         # Mock a successful command execution
         mock_run_command.return_value = "Command output"
@@ -49,12 +51,8 @@ def test_successful_command():
         }
 
 
-def test_failed_command():
+def test_failed_command(bash_tool):
     """Test that a failed command returns the appropriate error."""
-    bash_tool = BashTool(
-        workspace_root=Path("/tmp"),
-        require_confirmation=False,
-    )
     with patch("ii_agent.tools.bash_tool.run_command") as mock_run_command:
         # Mock a failed command execution that raises an exception
         mock_run_command.side_effect = Exception("Command failed")
@@ -74,12 +72,8 @@ def test_failed_command():
         }
 
 
-def test_command_with_exception():
+def test_command_with_exception(bash_tool):
     """Test that an exception during command execution is handled properly."""
-    bash_tool = BashTool(
-        workspace_root=Path("/tmp"),
-        require_confirmation=False,
-    )
     with patch("ii_agent.tools.bash_tool.run_command") as mock_run_command:
         # Mock an exception during command execution
         mock_run_command.side_effect = Exception("Test exception")
@@ -97,12 +91,8 @@ def test_command_with_exception():
         }
 
 
-def test_get_tool_start_message():
+def test_get_tool_start_message(bash_tool):
     """Test that the tool start message is formatted correctly."""
-    bash_tool = BashTool(
-        workspace_root=Path("/tmp"),
-        require_confirmation=False,
-    )
     message = bash_tool.get_tool_start_message({"command": "echo hello"})
     assert message == "Executing bash command: echo hello"
 
@@ -175,27 +165,18 @@ class BashToolTest(unittest.TestCase):
         self.mock_child.before = "command output"
         self.mock_prompt = "PROMPT>>"
 
-        # Create patches
-        self.start_shell_patch = patch(
-            "ii_agent.tools.bash_tool.start_persistent_shell",
-            return_value=(self.mock_child, self.mock_prompt),
+        # Patch both shell helpers with a single patcher
+        self.mock_start_shell = MagicMock(
+            return_value=(self.mock_child, self.mock_prompt)
         )
-        self.run_command_patch = patch(
-            "ii_agent.tools.bash_tool.run_command",
-            return_value="command output",
+        self.mock_run_command = MagicMock(return_value="command output")
+        patcher = patch.multiple(
+            "ii_agent.tools.bash_tool",
+            start_persistent_shell=self.mock_start_shell,
+            run_command=self.mock_run_command,
         )
-
-        # Start patches
-        self.mock_start_shell = self.start_shell_patch.start()
-        self.mock_run_command = self.run_command_patch.start()
-
-        # Reset mocks for each test to avoid interference between tests
-        self.mock_run_command.reset_mock()
-
-    def tearDown(self):
-        """Tear down test fixtures."""
-        self.start_shell_patch.stop()
-        self.run_command_patch.stop()
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     def test_init(self):
         """Test BashTool initialization."""
@@ -1,4 +1,5 @@
 from argparse import ArgumentParser
+from functools import lru_cache
 import uuid
 from pathlib import Path
 from ii_agent.utils import WorkspaceManager
@@ -104,13 +105,23 @@ def parse_common_args(parser: ArgumentParser):
     return parser
 
 
+@lru_cache(maxsize=None)
+def resolve_workspace_root(workspace_root: str) -> Path:
+    """Resolve the workspace root to an absolute path.
+
+    Cached because the root is fixed for the life of the server, while
+    resolve() walks every component of the path with a syscall each.
+    """
+    return Path(workspace_root).resolve()
+
+
 def create_workspace_manager_for_connection(
     workspace_root: str, use_container_workspace: bool = False
 ):
     """Create a new workspace manager instance for a websocket connection."""
     # Create unique subdirectory for this connection
     connection_id = str(uuid.uuid4())
-    workspace_path = Path(workspace_root).resolve()
+    workspace_path = resolve_workspace_root(workspace_root)
     connection_workspace = workspace_path / connection_id
     connection_workspace.mkdir(parents=True, exist_ok=True)
 
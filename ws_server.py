@@ -9,11 +9,15 @@ allowing real-time communication with a frontend application.
 import os
 import argparse
 import asyncio
+import atexit
 import json
 import logging
+import queue
+import re
 import uuid
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Dict, List, Set, Any
+from typing import Dict, List, Optional, Set, Tuple, Any
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -29,18 +33,24 @@ from fastapi import (
 
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import anyio
 import base64
 from sqlalchemy import asc, text
 
-from ii_agent.core.event import RealtimeEvent, EventType
+from ii_agent.core.event import RealtimeEvent, EventType, encode_event
 from ii_agent.db.models import Event
 from ii_agent.utils.constants import DEFAULT_MODEL, UPLOAD_FOLDER_NAME
-from utils import parse_common_args, create_workspace_manager_for_connection
+from utils import (
+    parse_common_args,
+    create_workspace_manager_for_connection,
+    resolve_workspace_root,
+)
 from ii_agent.agents.anthropic_fc import AnthropicFC
 from ii_agent.agents.base import BaseAgent
 from ii_agent.llm.base import LLMClient
 from ii_agent.utils import WorkspaceManager
+from ii_agent.utils.json_utils import json_dumps, json_loads
 from ii_agent.llm import get_client
 from ii_agent.utils.prompt_generator import enhance_user_prompt
 
@@ -57,6 +67,22 @@ from ii_agent.prompts.system_prompt import SYSTEM_PROMPT, SYSTEM_PROMPT_WITH_SEQ
 
 MAX_OUTPUT_TOKENS_PER_TURN = 32000
 MAX_TURNS = 200
+# Seconds a disconnected agent's queued events get to be saved
+MESSAGE_DRAIN_TIMEOUT = 30.0
+
+
+class _APIGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that only compresses responses under /api/.
+
+    Workspace downloads are mostly PNG, MP4 and PDF files that are already
+    compressed; gzipping them again on the event loop gains nothing.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/api/"):
+            await super().__call__(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
 
 
 app = FastAPI(title="Agent WebSocket API")
@@ -67,6 +93,9 @@ app.add_middleware(
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
 )
+# Compress API responses; session event histories in particular are large,
+# highly repetitive JSON
+app.add_middleware(_APIGZipMiddleware, minimum_size=1024, compresslevel=6)
 
 
 # Create a logger
@@ -85,10 +114,80 @@ active_tasks: Dict[WebSocket, asyncio.Task] = {}
 # Store message processors for each connection
 message_processors: Dict[WebSocket, asyncio.Task] = {}
 
+# Housekeeping tasks nobody awaits; the event loop only keeps weak references
+background_tasks: Set[asyncio.Task] = set()
+
 # Store global args for use in endpoint
 global_args = None
 
 
+async def send_event(
+    websocket: WebSocket, event_type: EventType, content: Dict[str, Any]
+) -> None:
+    """Send an event to the client without building a RealtimeEvent model."""
+    await websocket.send_text(encode_event(event_type, content))
+
+
+# Pre-encoded frames for events whose content never changes
+_PONG = encode_event(EventType.PONG, {})
+_AGENT_INITIALIZED = encode_event(
+    EventType.AGENT_INITIALIZED, {"message": "Agent initialized"}
+)
+_PROCESSING = encode_event(
+    EventType.PROCESSING, {"message": "Processing your request..."}
+)
+_QUERY_CANCELLED = encode_event(EventType.SYSTEM, {"message": "Query cancelled"})
+_QUERY_EDITING = encode_event(
+    EventType.SYSTEM, {"message": "Query editing mode activated"}
+)
+_SESSION_HISTORY_CLEARED = encode_event(
+    EventType.SYSTEM,
+    {"message": "Session history cleared from last event to last user message"},
+)
+_ERR_QUERY_IN_PROGRESS = encode_event(
+    EventType.ERROR, {"message": "A query is already being processed"}
+)
+_ERR_NO_AGENT = encode_event(
+    EventType.ERROR, {"message": "No active agent for this connection"}
+)
+_ERR_AGENT_NOT_INITIALIZED = encode_event(
+    EventType.ERROR, {"message": "Agent not initialized for this connection"}
+)
+_ERR_WORKSPACE_NOT_INITIALIZED = encode_event(
+    EventType.ERROR, {"message": "Workspace not initialized"}
+)
+_ERR_NO_SESSION = encode_event(
+    EventType.ERROR, {"message": "No active session to clear"}
+)
+_ERR_INVALID_JSON = encode_event(EventType.ERROR, {"message": "Invalid JSON format"})
+_ERR_INVALID_MESSAGE = encode_event(
+    EventType.ERROR,
+    {"message": "Invalid message format: expected an object with type and content"},
+)
+
+# Only the workspace path varies; it is substituted as an encoded JSON string
+_CONNECTION_ESTABLISHED_TEMPLATE = (
+    '{"type":"connection_established","content":'
+    '{"message":"Connected to Agent WebSocket Server","workspace_path":%s}}'
+)
+
+
+def _parse_client_message(data: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Decode a client frame into its type and content.
+
+    Returns None when the frame is valid JSON but not an object with a string
+    "type" and an object "content", so the handlers can use content directly.
+    """
+    message = json_loads(data)
+    if not isinstance(message, dict):
+        return None
+    msg_type = message.get("type")
+    content = message.get("content", {})
+    if not isinstance(msg_type, str) or not isinstance(content, dict):
+        return None
+    return msg_type, content
+
+
 def map_model_name_to_client(model_name: str, ws_content: Dict[str, Any]) -> LLMClient:
     """Create an LLM client based on the model name and configuration.
     
@@ -141,14 +240,8 @@ async def websocket_endpoint(websocket: WebSocket):
 
     try:    
         # Initial connection message with session info
-        await websocket.send_json(
-            RealtimeEvent(
-                type=EventType.CONNECTION_ESTABLISHED,
-                content={
-                    "message": "Connected to Agent WebSocket Server",
-                    "workspace_path": str(workspace_manager.root),
-                },
-            ).model_dump()
+        await websocket.send_text(
+            _CONNECTION_ESTABLISHED_TEMPLATE % json_dumps(str(workspace_manager.root))
         )
 
         # Process messages from the client
@@ -156,9 +249,11 @@ async def websocket_endpoint(websocket: WebSocket):
             # Receive and parse message
             data = await websocket.receive_text()
             try:
-                message = json.loads(data)
-                msg_type = message.get("type")
-                content = message.get("content", {})
+                parsed = _parse_client_message(data)
+                if parsed is None:
+                    await websocket.send_text(_ERR_INVALID_MESSAGE)
+                    continue
+                msg_type, content = parsed
 
                 if msg_type == "init_agent":
                     model_name = content.get("model_name", DEFAULT_MODEL)
@@ -175,24 +270,12 @@ async def websocket_endpoint(websocket: WebSocket):
                     # Start message processor for this connection
                     message_processor = agent.start_message_processing()
                     message_processors[websocket] = message_processor
-                    await websocket.send_json(
-                        RealtimeEvent(
-                            type=EventType.AGENT_INITIALIZED,
-                            content={"message": "Agent initialized"},
-                        ).model_dump()
-                    )
+                    await websocket.send_text(_AGENT_INITIALIZED)
 
                 elif msg_type == "query":
                     # Check if there's an active task for this connection
                     if websocket in active_tasks and not active_tasks[websocket].done():
-                        await websocket.send_json(
-                            RealtimeEvent(
-                                type=EventType.ERROR,
-                                content={
-                                    "message": "A query is already being processed"
-                                },
-                            ).model_dump()
-                        )
+                        await websocket.send_text(_ERR_QUERY_IN_PROGRESS)
                         continue
 
                     # Process a query to the agent
@@ -201,12 +284,7 @@ async def websocket_endpoint(websocket: WebSocket):
                     files = content.get("files", [])
 
                     # Send acknowledgment
-                    await websocket.send_json(
-                        RealtimeEvent(
-                            type=EventType.PROCESSING,
-                            content={"message": "Processing your request..."},
-                        ).model_dump()
-                    )
+                    await websocket.send_text(_PROCESSING)
 
                     # Run the agent with the query in a separate task
                     task = asyncio.create_task(
@@ -217,64 +295,37 @@ async def websocket_endpoint(websocket: WebSocket):
                 elif msg_type == "workspace_info":
                     # Send information about the current workspace
                     if workspace_manager:
-                        await websocket.send_json(
-                            RealtimeEvent(
-                                type=EventType.WORKSPACE_INFO,
-                                content={
-                                    "path": str(workspace_manager.root),
-                                },
-                            ).model_dump()
+                        await send_event(
+                            websocket,
+                            EventType.WORKSPACE_INFO,
+                            {
+                                "path": str(workspace_manager.root),
+                            },
                         )
                     else:
-                        await websocket.send_json(
-                            RealtimeEvent(
-                                type=EventType.ERROR,
-                                content={"message": "Workspace not initialized"},
-                            ).model_dump()
-                        )
+                        await websocket.send_text(_ERR_WORKSPACE_NOT_INITIALIZED)
 
                 elif msg_type == "ping":
                     # Simple ping to keep connection alive
-                    await websocket.send_json(
-                        RealtimeEvent(type=EventType.PONG, content={}).model_dump()
-                    )
+                    await websocket.send_text(_PONG)
 
                 elif msg_type == "cancel":
                     # Get the agent for this connection
                     agent = active_agents.get(websocket)
                     if not agent:
-                        await websocket.send_json(
-                            RealtimeEvent(
-                                type=EventType.ERROR,
-                                content={
-                                    "message": "No active agent for this connection"
-                                },
-                            ).model_dump()
-                        )
+                        await websocket.send_text(_ERR_NO_AGENT)
                         continue
 
                     agent.cancel()
 
                     # Send acknowledgment that cancellation was received
-                    await websocket.send_json(
-                        RealtimeEvent(
-                            type=EventType.SYSTEM,
-                            content={"message": "Query cancelled"},
-                        ).model_dump()
-                    )
+                    await websocket.send_text(_QUERY_CANCELLED)
 
                 elif msg_type == "edit_query":
                     # Get the agent for this connection
                     agent = active_agents.get(websocket)
                     if not agent:
-                        await websocket.send_json(
-                            RealtimeEvent(
-                                type=EventType.ERROR,
-                                content={
-                                    "message": "No active agent for this connection"
-                                },
-                            ).model_dump()
-                        )
+                        await websocket.send_text(_ERR_NO_AGENT)
                         continue
 
                     # Cancel the agent
@@ -289,50 +340,25 @@ async def websocket_endpoint(websocket: WebSocket):
                             agent.db_manager.delete_events_from_last_to_user_message(
                                 agent.session_id
                             )
-                            await websocket.send_json(
-                                RealtimeEvent(
-                                    type=EventType.SYSTEM,
-                                    content={
-                                        "message": "Session history cleared from last event to last user message"
-                                    },
-                                ).model_dump()
-                            )
+                            await websocket.send_text(_SESSION_HISTORY_CLEARED)
                         except Exception as e:
-                            logger.error(f"Error deleting session events: {str(e)}")
-                            await websocket.send_json(
-                                RealtimeEvent(
-                                    type=EventType.ERROR,
-                                    content={
-                                        "message": f"Error clearing history: {str(e)}"
-                                    },
-                                ).model_dump()
+                            logger.error("Error deleting session events: %s", e)
+                            await send_event(
+                                websocket,
+                                EventType.ERROR,
+                                {
+                                    "message": f"Error clearing history: {str(e)}"
+                                },
                             )
                     else:
-                        await websocket.send_json(
-                            RealtimeEvent(
-                                type=EventType.ERROR,
-                                content={"message": "No active session to clear"},
-                            ).model_dump()
-                        )
+                        await websocket.send_text(_ERR_NO_SESSION)
 
                     # Send acknowledgment that query editing was received
-                    await websocket.send_json(
-                        RealtimeEvent(
-                            type=EventType.SYSTEM,
-                            content={"message": "Query editing mode activated"},
-                        ).model_dump()
-                    )
+                    await websocket.send_text(_QUERY_EDITING)
 
                     # Check if there's an active task for this connection
                     if websocket in active_tasks and not active_tasks[websocket].done():
-                        await websocket.send_json(
-                            RealtimeEvent(
-                                type=EventType.ERROR,
-                                content={
-                                    "message": "A query is already being processed"
-                                },
-                            ).model_dump()
-                        )
+                        await websocket.send_text(_ERR_QUERY_IN_PROGRESS)
                         continue
 
                     # Process a query to the agent
@@ -341,12 +367,7 @@ async def websocket_endpoint(websocket: WebSocket):
                     files = content.get("files", [])
 
                     # Send acknowledgment
-                    await websocket.send_json(
-                        RealtimeEvent(
-                            type=EventType.PROCESSING,
-                            content={"message": "Processing your request..."},
-                        ).model_dump()
-                    )
+                    await websocket.send_text(_PROCESSING)
 
                     # Run the agent with the query in a separate task
                     task = asyncio.create_task(
@@ -371,55 +392,49 @@ async def websocket_endpoint(websocket: WebSocket):
 
                     if success and enhanced_prompt:
                         # Send the enhanced prompt back to the client
-                        await websocket.send_json(
-                            RealtimeEvent(
-                                type=EventType.PROMPT_GENERATED,
-                                content={
-                                    "result": enhanced_prompt,
-                                    "original_request": user_input,
-                                },
-                            ).model_dump()
+                        await send_event(
+                            websocket,
+                            EventType.PROMPT_GENERATED,
+                            {
+                                "result": enhanced_prompt,
+                                "original_request": user_input,
+                            },
                         )
                     else:
                         # Send error message
-                        await websocket.send_json(
-                            RealtimeEvent(
-                                type=EventType.ERROR,
-                                content={"message": message},
-                            ).model_dump()
+                        await send_event(
+                            websocket,
+                            EventType.ERROR,
+                            {"message": message},
                         )
 
                 else:
                     # Unknown message type
-                    await websocket.send_json(
-                        RealtimeEvent(
-                            type=EventType.ERROR,
-                            content={"message": f"Unknown message type: {msg_type}"},
-                        ).model_dump()
+                    await send_event(
+                        websocket,
+                        EventType.ERROR,
+                        {"message": f"Unknown message type: {msg_type}"},
                     )
 
             except json.JSONDecodeError:
-                await websocket.send_json(
-                    RealtimeEvent(
-                        type=EventType.ERROR, content={"message": "Invalid JSON format"}
-                    ).model_dump()
-                )
+                await websocket.send_text(_ERR_INVALID_JSON)
             except Exception as e:
-                logger.error(f"Error processing message: {str(e)}")
-                await websocket.send_json(
-                    RealtimeEvent(
-                        type=EventType.ERROR,
-                        content={"message": f"Error processing request: {str(e)}"},
-                    ).model_dump()
+                logger.error("Error processing message: %s", e)
+                await send_event(
+                    websocket,
+                    EventType.ERROR,
+                    {"message": f"Error processing request: {str(e)}"},
                 )
 
     except WebSocketDisconnect:
         # Handle disconnection
         logger.info("Client disconnected")
-        cleanup_connection(websocket)
     except Exception as e:
         # Handle other exceptions
-        logger.error(f"WebSocket error: {str(e)}")
+        logger.error("WebSocket error: %s", e)
+    finally:
+        # Runs on every exit path, including cancellation at shutdown, so no
+        # connection is left referenced from the module-level registries
         cleanup_connection(websocket)
 
 
@@ -430,12 +445,7 @@ async def run_agent_async(
     agent = active_agents.get(websocket)
 
     if not agent:
-        await websocket.send_json(
-            RealtimeEvent(
-                type=EventType.ERROR,
-                content={"message": "Agent not initialized for this connection"},
-            ).model_dump()
-        )
+        await websocket.send_text(_ERR_AGENT_NOT_INITIALIZED)
         return
 
     try:
@@ -444,21 +454,35 @@ async def run_agent_async(
             RealtimeEvent(type=EventType.USER_MESSAGE, content={"text": user_input})
         )
         # Run the agent with the query
-        await anyio.to_thread.run_sync(
-            agent.run_agent, user_input, files, resume, abandon_on_cancel=True
+        run = asyncio.ensure_future(
+            anyio.to_thread.run_sync(
+                agent.run_agent, user_input, files, resume, abandon_on_cancel=True
+            )
         )
+        try:
+            await asyncio.shield(run)
+        except asyncio.CancelledError:
+            # The worker thread cannot be interrupted; agent.cancel() stops it
+            # at its next step. Finish only once it has returned, so whoever
+            # waits on this task knows no more events will be queued.
+            await asyncio.wait([run])
+            raise
 
     except Exception as e:
-        logger.error(f"Error running agent: {str(e)}")
+        logger.error("Error running agent: %s", e)
         import traceback
 
         traceback.print_exc()
-        await websocket.send_json(
-            RealtimeEvent(
-                type=EventType.ERROR,
-                content={"message": f"Error running agent: {str(e)}"},
-            ).model_dump()
-        )
+        try:
+            await send_event(
+                websocket,
+                EventType.ERROR,
+                {"message": f"Error running agent: {str(e)}"},
+            )
+        except Exception:
+            # The client may have disconnected while the agent was running;
+            # nothing is awaiting this task, so don't let the send error escape
+            logger.info("Could not report agent error, client disconnected")
     finally:
         # Clean up the task reference
         if websocket in active_tasks:
@@ -468,27 +492,89 @@ async def run_agent_async(
 def cleanup_connection(websocket: WebSocket):
     """Clean up resources associated with a websocket connection."""
     # Remove from active connections
-    if websocket in active_connections:
-        active_connections.remove(websocket)
+    active_connections.discard(websocket)
 
     # Set websocket to None in the agent but keep the message processor running
-    if websocket in active_agents:
-        agent = active_agents[websocket]
+    agent = active_agents.pop(websocket, None)
+    if agent is not None:
         agent.websocket = (
             None  # This will prevent sending to websocket but keep processing
         )
-        # Don't cancel the message processor - it will continue saving to database
-        if websocket in message_processors:
-            del message_processors[websocket]  # Just remove the reference
+    # Don't cancel the message processor yet - it keeps saving to the database
+    # until _stop_message_processor ends it
+    message_processor = message_processors.pop(websocket, None)
 
     # Cancel any running tasks
-    if websocket in active_tasks and not active_tasks[websocket].done():
-        active_tasks[websocket].cancel()
-        del active_tasks[websocket]
+    task = active_tasks.pop(websocket, None)
+    if task is not None and not task.done():
+        if agent is not None:
+            agent.cancel()
+        task.cancel()
+    else:
+        task = None
+    if agent is not None and message_processor is not None:
+        # Stop the processor once the run has returned and the events it
+        # queued have been saved
+        _spawn_background(
+            _stop_message_processor(agent.message_queue, message_processor, task)
+        )
+
+
+async def _stop_message_processor(
+    message_queue: asyncio.Queue,
+    message_processor: asyncio.Task,
+    agent_task: Optional[asyncio.Task] = None,
+):
+    """Cancel a message processor after it drains, or after a timeout."""
+    try:
+        if agent_task is not None:
+            # The task ends only after the agent's worker thread has returned,
+            # so every event of the cancelled run is queued by then
+            await asyncio.wait([agent_task])
+        await asyncio.wait_for(message_queue.join(), timeout=MESSAGE_DRAIN_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(
+            "Message queue not drained after %ss, dropping %d events",
+            MESSAGE_DRAIN_TIMEOUT,
+            message_queue.qsize(),
+        )
+    finally:
+        message_processor.cancel()
 
-    # Remove agent for this connection
-    if websocket in active_agents:
-        del active_agents[websocket]
+
+def _spawn_background(coro) -> asyncio.Task:
+    """Run coro in a task that stays referenced until it finishes."""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
+
+
+def get_agent_logger() -> logging.Logger:
+    """Return the logger shared by all agents, setting it up on first use.
+
+    A single logger keeps one set of handlers (and one open log file) for the
+    whole server instead of a new logger and FileHandler per connection.
+    Records are handed to a listener thread through a queue, so logging from
+    the event loop never waits on disk or terminal writes.
+    """
+    agent_logger = logging.getLogger("agent_logs")
+    # Ensure we don't duplicate handlers
+    if not agent_logger.handlers:
+        agent_logger.setLevel(logging.DEBUG)
+        # Prevent propagation to root logger to avoid duplicate logs
+        agent_logger.propagate = False
+        handlers: List[logging.Handler] = [logging.FileHandler(global_args.logs_path)]
+        if not global_args.minimize_stdout_logs:
+            handlers.append(logging.StreamHandler())
+
+        log_queue = queue.SimpleQueue()
+        agent_logger.addHandler(QueueHandler(log_queue))
+        listener = QueueListener(log_queue, *handlers)
+        listener.start()
+        # Flush whatever is still queued when the server exits
+        atexit.register(listener.stop)
+    return agent_logger
 
 
 def create_agent_for_connection(
@@ -501,17 +587,7 @@ def create_agent_for_connection(
     """Create a new agent instance for a websocket connection."""
     global global_args
     device_id = websocket.query_params.get("device_id")
-    # Setup logging
-    logger_for_agent_logs = logging.getLogger(f"agent_logs_{id(websocket)}")
-    logger_for_agent_logs.setLevel(logging.DEBUG)
-    # Prevent propagation to root logger to avoid duplicate logs
-    logger_for_agent_logs.propagate = False
-
-    # Ensure we don't duplicate handlers
-    if not logger_for_agent_logs.handlers:
-        logger_for_agent_logs.addHandler(logging.FileHandler(global_args.logs_path))
-        if not global_args.minimize_stdout_logs:
-            logger_for_agent_logs.addHandler(logging.StreamHandler())
+    logger_for_agent_logs = get_agent_logger()
 
     # Initialize database manager
     db_manager = DatabaseManager()
@@ -623,6 +699,124 @@ def main():
     uvicorn.run(app, host=args.host, port=args.port)
 
 
+# Must be a multiple of 4 so every slice is independently decodable base64
+_BASE64_CHUNK_SIZE = 4 * 64 * 1024
+
+# Characters b64decode would skip anyway, such as CRLF line wrapping
+_NON_BASE64_CHARS = re.compile(r"[^A-Za-z0-9+/=]+")
+
+
+# Size of the blocks raw upload bodies are written to disk in
+_UPLOAD_WRITE_SIZE = 1024 * 1024
+
+
+def _write_base64_file(fd: int, encoded: str) -> None:
+    """Decode base64 data into the file open on fd, chunk by chunk.
+
+    Only one chunk of decoded bytes is alive at a time instead of a copy of
+    the whole file.
+    """
+    # Drop them first, or the slices would no longer align to 4 characters
+    encoded = _NON_BASE64_CHARS.sub("", encoded)
+    with os.fdopen(fd, "wb") as f:
+        for start in range(0, len(encoded), _BASE64_CHUNK_SIZE):
+            f.write(base64.b64decode(encoded[start : start + _BASE64_CHUNK_SIZE]))
+
+
+def _write_text_file(fd: int, content: str) -> None:
+    with os.fdopen(fd, "w") as f:
+        f.write(content)
+
+
+class _UploadError(Exception):
+    """Raised for client errors while resolving an upload destination."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+# Directories this process has already created, so repeat uploads skip mkdir
+_created_dirs: Set[Path] = set()
+
+
+def _ensure_dir(path: Path) -> None:
+    if path not in _created_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(path)
+
+
+# Numbered suffixes to try before falling back to a random one
+_MAX_NUMBERED_UPLOAD_NAMES = 8
+
+
+def _create_upload_file(session_id: str, file_path: str) -> tuple[int, Path, str]:
+    """Create a new file for an upload in the session's upload dir.
+
+    Returns a write-only descriptor for the file, its absolute path and its
+    path relative to the upload directory. The file is created with O_EXCL,
+    so a name that is already taken gets a numeric suffix instead of being
+    overwritten, with no window between the check and the create.
+    """
+    # Find the workspace path for this session
+    workspace_path = resolve_workspace_root(global_args.workspace) / session_id
+    if not workspace_path.exists():
+        raise _UploadError(404, f"Workspace not found for session: {session_id}")
+
+    upload_dir = (workspace_path / UPLOAD_FOLDER_NAME).resolve()
+
+    # Ensure the file path is relative to the workspace
+    if Path(file_path).is_absolute():
+        file_path = Path(file_path).name
+
+    # Create the full path within the upload directory, refusing ".." parts
+    # that would lead out of it
+    original_path = (upload_dir / file_path).resolve()
+    if not original_path.is_relative_to(upload_dir):
+        raise _UploadError(400, f"Invalid file path: {file_path}")
+    full_path = original_path
+
+    # Ensure the upload directory and any subdirectories exist
+    _ensure_dir(full_path.parent)
+
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL
+    counter = 0
+    while True:
+        try:
+            fd = os.open(full_path, flags, 0o666)
+            break
+        except FileExistsError:
+            # Handle filename collision by adding a suffix
+            counter += 1
+            if counter <= _MAX_NUMBERED_UPLOAD_NAMES:
+                suffix = str(counter)
+            else:
+                suffix = uuid.uuid4().hex[:8]
+            full_path = original_path.with_name(
+                f"{original_path.stem}_{suffix}{original_path.suffix}"
+            )
+        except FileNotFoundError:
+            # The directory was removed after we created it
+            _created_dirs.discard(full_path.parent)
+            _ensure_dir(full_path.parent)
+
+    # Reflect any new name, and report the path without ".." parts
+    file_path = full_path.relative_to(upload_dir).as_posix()
+
+    return fd, full_path, file_path
+
+
+def _upload_response(full_path: Path, file_path: str) -> dict:
+    # Return the path relative to the workspace for client use
+    relative_path = f"/{UPLOAD_FOLDER_NAME}/{file_path}"
+
+    return {
+        "message": "File uploaded successfully",
+        "file": {"path": relative_path, "saved_path": str(full_path)},
+    }
+
+
 @app.post("/api/upload")
 async def upload_file_endpoint(request: Request):
     """API endpoint for uploading a single file to the workspace.
@@ -630,6 +824,9 @@ async def upload_file_endpoint(request: Request):
     Expects a JSON payload with:
     - session_id: UUID of the session/workspace
     - file: Object with path and content properties
+
+    Binary files have to be sent as base64 data URLs here; prefer
+    /api/upload/binary, which takes the raw bytes.
     """
     try:
         data = await request.json()
@@ -646,18 +843,6 @@ async def upload_file_endpoint(request: Request):
                 status_code=400, content={"error": "No file provided for upload"}
             )
 
-        # Find the workspace path for this session
-        workspace_path = Path(global_args.workspace).resolve() / session_id
-        if not workspace_path.exists():
-            return JSONResponse(
-                status_code=404,
-                content={"error": f"Workspace not found for session: {session_id}"},
-            )
-
-        # Create the upload directory if it doesn't exist
-        upload_dir = workspace_path / UPLOAD_FOLDER_NAME
-        upload_dir.mkdir(parents=True, exist_ok=True)
-
         file_path = file_info.get("path", "")
         file_content = file_info.get("content", "")
 
@@ -666,62 +851,98 @@ async def upload_file_endpoint(request: Request):
                 status_code=400, content={"error": "File path is required"}
             )
 
-        # Ensure the file path is relative to the workspace
-        if Path(file_path).is_absolute():
-            file_path = Path(file_path).name
-
-        # Create the full path within the upload directory
-        original_path = upload_dir / file_path
-        full_path = original_path
-
-        # Handle filename collision by adding a suffix
-        if full_path.exists():
-            base_name = full_path.stem
-            extension = full_path.suffix
-            counter = 1
-
-            # Keep incrementing counter until we find a unique filename
-            while full_path.exists():
-                new_filename = f"{base_name}_{counter}{extension}"
-                full_path = upload_dir / new_filename
-                counter += 1
-
-            # Update the file_path to reflect the new name
-            file_path = f"{full_path.relative_to(upload_dir)}"
-
-        # Ensure any subdirectories exist
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-
         # Check if content is base64 encoded (for binary files)
         if file_content.startswith("data:"):
             # Handle data URLs (e.g., "data:application/pdf;base64,...")
             # Split the header from the base64 content
             header, encoded = file_content.split(",", 1)
+            logger.debug(
+                "Base64 upload of %s; /api/upload/binary avoids the encoding",
+                file_path,
+            )
 
-            # Decode the content
-            decoded = base64.b64decode(encoded)
-
-            # Write binary content
-            with open(full_path, "wb") as f:
-                f.write(decoded)
+            fd, full_path, file_path = _create_upload_file(session_id, file_path)
+            try:
+                # Decode and write off the event loop
+                await asyncio.to_thread(_write_base64_file, fd, encoded)
+            except Exception:
+                # Don't leave a truncated file holding the name
+                full_path.unlink(missing_ok=True)
+                raise
         else:
             # Write text content
-            with open(full_path, "w") as f:
-                f.write(file_content)
+            fd, full_path, file_path = _create_upload_file(session_id, file_path)
+            try:
+                await asyncio.to_thread(_write_text_file, fd, file_content)
+            except Exception:
+                full_path.unlink(missing_ok=True)
+                raise
 
         # Log the upload
-        logger.info(f"File uploaded to {full_path}")
+        logger.info("File uploaded to %s", full_path)
+
+        return _upload_response(full_path, file_path)
+
+    except _UploadError as e:
+        return JSONResponse(status_code=e.status_code, content={"error": e.message})
+    except Exception as e:
+        logger.error("Error uploading file: %s", e)
+        return JSONResponse(
+            status_code=500, content={"error": f"Error uploading file: {str(e)}"}
+        )
+
 
-        # Return the path relative to the workspace for client use
-        relative_path = f"/{UPLOAD_FOLDER_NAME}/{file_path}"
+@app.post("/api/upload/binary")
+async def upload_binary_file_endpoint(request: Request):
+    """API endpoint for uploading a single file as raw bytes.
+
+    The request body is the file content itself. Expects query parameters:
+    - session_id: UUID of the session/workspace
+    - path: Name of the file to create in the upload directory
+    """
+    try:
+        session_id = request.query_params.get("session_id")
+        file_path = request.query_params.get("path", "")
+
+        if not session_id:
+            return JSONResponse(
+                status_code=400, content={"error": "session_id is required"}
+            )
+
+        if not file_path:
+            return JSONResponse(
+                status_code=400, content={"error": "File path is required"}
+            )
+
+        fd, full_path, file_path = _create_upload_file(session_id, file_path)
+
+        # Stream the body to disk without buffering the whole file. Chunks
+        # are coalesced so each worker-thread write moves a sizeable block.
+        pending = bytearray()
+        try:
+            async with anyio.wrap_file(os.fdopen(fd, "wb")) as f:
+                async for chunk in request.stream():
+                    pending += chunk
+                    if len(pending) >= _UPLOAD_WRITE_SIZE:
+                        await f.write(pending)
+                        pending.clear()
+                if pending:
+                    await f.write(pending)
+        except BaseException:
+            # The client went away or the write failed: don't leave a
+            # partial file holding the name
+            full_path.unlink(missing_ok=True)
+            raise
+
+        # Log the upload
+        logger.info("File uploaded to %s", full_path)
 
-        return {
-            "message": "File uploaded successfully",
-            "file": {"path": relative_path, "saved_path": str(full_path)},
-        }
+        return _upload_response(full_path, file_path)
 
+    except _UploadError as e:
+        return JSONResponse(status_code=e.status_code, content={"error": e.message})
     except Exception as e:
-        logger.error(f"Error uploading file: {str(e)}")
+        logger.error("Error uploading file: %s", e)
         return JSONResponse(
             status_code=500, content={"error": f"Error uploading file: {str(e)}"}
         )
@@ -780,7 +1001,7 @@ async def get_sessions_by_device_id(device_id: str):
                     "workspace_dir": row.workspace_dir,
                     "created_at": row.created_at,
                     "device_id": row.device_id,
-                    "first_message": json.loads(row.first_message)
+                    "first_message": json_loads(row.first_message)
                     .get("content", {})
                     .get("text", "")
                     if row.first_message